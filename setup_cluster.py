@@ -5,14 +5,28 @@ RKE2 Cluster Setup Automation Script
 This script automates the setup and deployment of an RKE2 cluster using Terraform.
 """
 
+import asyncio
+import atexit
+import json
+import logging
+import shlex
+import shutil
 import subprocess
 import sys
 import os
+import tempfile
+import threading
 import time
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Tuple
 
+try:
+    import asyncssh
+except ImportError:
+    asyncssh = None
+
 
 class Colors:
     """ANSI color codes for terminal output"""
@@ -26,6 +40,19 @@ class Colors:
     BOLD = '\033[1m'
 
 
+class ColoredFormatter(logging.Formatter):
+    """Colorize log lines based on level, or an explicit color attribute"""
+    LEVEL_COLORS = {
+        logging.WARNING: Colors.WARNING,
+        logging.ERROR: Colors.FAIL,
+    }
+
+    def format(self, record):
+        color = getattr(record, "color", None) or self.LEVEL_COLORS.get(record.levelno)
+        message = record.getMessage()
+        return f"{color}{message}{Colors.ENDC}" if color else message
+
+
 class ClusterSetup:
     def __init__(self, master_ip: str, worker_ips: List[str], ssh_user: str, ssh_key_path: str):
         self.master_ip = master_ip
@@ -33,64 +60,213 @@ class ClusterSetup:
         self.ssh_user = ssh_user
         self.ssh_key_path = Path(ssh_key_path).expanduser()
         self.all_nodes = [master_ip] + worker_ips
+        self.tf_dir = Path(__file__).parent / "cluster"
+        self.kubeconfig = (self.tf_dir / "kubeconfig.yaml").resolve()
+
+        # SSH multiplexing: the first connection to each host opens a master
+        # socket, subsequent ssh invocations reuse it instead of paying a
+        # full TCP + key-exchange + auth handshake per command.
+        self._ssh_ctl_dir = tempfile.mkdtemp(prefix="rke2-ssh-")
+        self.known_hosts = Path(self._ssh_ctl_dir) / "known_hosts"
+        atexit.register(self._close_ssh_masters)
+
+        # Single buffered logger instead of raw prints: one stdout write per
+        # event, serialized by the handler lock across per-node workers
+        self.log = logging.getLogger("rke2setup")
+        if not self.log.handlers:
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(ColoredFormatter())
+            self.log.addHandler(handler)
+            self.log.setLevel(logging.INFO)
+
+        # When asyncssh is available, remote commands share one authenticated
+        # connection per host instead of spawning an ssh process per command.
+        # The connections live on a dedicated event loop thread so the
+        # thread-pool workers can submit commands concurrently.
+        self._conns = {}
+        self._conn_locks = {}
+        if asyncssh is not None:
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, daemon=True).start()
+        else:
+            self._loop = None
+
+    @property
+    def _ssh_opts(self) -> List[str]:
+        """SSH options shared by every ssh invocation"""
+        opts = [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={self._ssh_ctl_dir}/%r@%h:%p",
+            "-o", "ControlPersist=10m",
+            "-i", str(self.ssh_key_path),
+        ]
+        # Verify against the keyscanned known_hosts when available instead
+        # of accepting (and warning about) unknown host keys per connection
+        if self.known_hosts.exists():
+            opts += [
+                "-o", f"UserKnownHostsFile={self.known_hosts}",
+                "-o", "StrictHostKeyChecking=yes",
+            ]
+        else:
+            opts += ["-o", "StrictHostKeyChecking=no"]
+        return opts
+
+    def scan_host_keys(self):
+        """Collect host keys from all nodes into a project-local known_hosts"""
+        self.print_step("Scanning Host Keys")
+
+        returncode, stdout, _ = self.run_command(
+            ["ssh-keyscan", "-H", "-T", "5", *self.all_nodes],
+            check=False, capture_output=True
+        )
+
+        if returncode == 0 and stdout.strip():
+            self.known_hosts.write_text(stdout)
+            self.print_success(f"Host keys collected for {len(self.all_nodes)} nodes")
+        else:
+            self.print_warning("ssh-keyscan failed, falling back to StrictHostKeyChecking=no")
 
     def print_step(self, message: str):
-        """Print a formatted step message"""
-        print(f"\n{Colors.HEADER}{Colors.BOLD}{'='*60}{Colors.ENDC}")
-        print(f"{Colors.HEADER}{Colors.BOLD}{message}{Colors.ENDC}")
-        print(f"{Colors.HEADER}{Colors.BOLD}{'='*60}{Colors.ENDC}\n")
+        """Log a formatted step message"""
+        separator = '=' * 60
+        self.log.info(
+            "\n".join(["", separator, message, separator, ""]),
+            extra={"color": Colors.HEADER + Colors.BOLD}
+        )
 
     def print_success(self, message: str):
-        """Print a success message"""
-        print(f"{Colors.OKGREEN}✓ {message}{Colors.ENDC}")
+        """Log a success message"""
+        self.log.info(f"✓ {message}", extra={"color": Colors.OKGREEN})
 
     def print_error(self, message: str):
-        """Print an error message"""
-        print(f"{Colors.FAIL}✗ {message}{Colors.ENDC}")
+        """Log an error message"""
+        self.log.error(f"✗ {message}")
 
     def print_warning(self, message: str):
-        """Print a warning message"""
-        print(f"{Colors.WARNING}⚠ {message}{Colors.ENDC}")
-
-    def run_command(self, command: str, check: bool = True, capture_output: bool = False) -> Tuple[int, str, str]:
-        """Run a shell command and return the result"""
+        """Log a warning message"""
+        self.log.warning(f"⚠ {message}")
+
+    def _map_nodes(self, worker, nodes: List[str] = None) -> list:
+        """Run a per-node worker concurrently across nodes"""
+        if nodes is None:
+            nodes = self.all_nodes
+        with ThreadPoolExecutor(max_workers=min(32, len(nodes))) as executor:
+            return list(executor.map(worker, nodes))
+
+    def run_command(self, command: List[str], check: bool = True, capture_output: bool = False,
+                    input: str = None, cwd: Path = None, env: dict = None) -> Tuple[int, str, str]:
+        """Run a command given as an argv list and return the result"""
         try:
             result = subprocess.run(
                 command,
-                shell=True,
                 check=check,
                 capture_output=capture_output,
+                input=input,
+                cwd=cwd,
+                env=env,
                 text=True
             )
             return result.returncode, result.stdout if capture_output else "", result.stderr if capture_output else ""
         except subprocess.CalledProcessError as e:
             if check:
-                self.print_error(f"Command failed: {command}")
+                self.print_error(f"Command failed: {' '.join(command)}")
                 self.print_error(f"Error: {e.stderr if capture_output else str(e)}")
             return e.returncode, e.stdout if capture_output else "", e.stderr if capture_output else ""
+        except FileNotFoundError as e:
+            # Without a shell there is no exit 127 for a missing executable,
+            # so report it the same way instead of letting the error escape
+            if check:
+                self.print_error(f"Command not found: {command[0]}")
+            return 127, "", str(e)
+
+    def run_command_streaming(self, command: List[str], cwd: Path = None, env: dict = None) -> int:
+        """Run a command, printing output line by line as it is produced"""
+        try:
+            proc = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+                cwd=cwd,
+                env=env
+            )
+        except FileNotFoundError:
+            self.print_error(f"Command not found: {command[0]}")
+            return 127
+        for line in iter(proc.stdout.readline, ''):
+            self.log.info(line.rstrip("\n"))
+        proc.stdout.close()
+        return proc.wait()
 
     def ssh_command(self, host: str, command: str, check: bool = True) -> Tuple[int, str, str]:
         """Execute a command on a remote host via SSH"""
-        ssh_cmd = f"ssh -o StrictHostKeyChecking=no -i {self.ssh_key_path} {self.ssh_user}@{host} '{command}'"
+        if self._loop is not None:
+            return self._asyncssh_command(host, command)
+        ssh_cmd = ["ssh", *self._ssh_opts, f"{self.ssh_user}@{host}", command]
         return self.run_command(ssh_cmd, check=check, capture_output=True)
 
+    def _asyncssh_command(self, host: str, command: str) -> Tuple[int, str, str]:
+        """Execute a remote command over a cached asyncssh connection"""
+        async def run():
+            lock = self._conn_locks.setdefault(host, asyncio.Lock())
+            async with lock:
+                if host not in self._conns:
+                    self._conns[host] = await asyncssh.connect(
+                        host,
+                        username=self.ssh_user,
+                        client_keys=[str(self.ssh_key_path)],
+                        known_hosts=str(self.known_hosts) if self.known_hosts.exists() else None
+                    )
+            result = await self._conns[host].run(command, check=False)
+            return result.exit_status if result.exit_status is not None else 255, result.stdout, result.stderr
+
+        try:
+            return asyncio.run_coroutine_threadsafe(run(), self._loop).result()
+        except (OSError, asyncssh.Error) as e:
+            return 255, "", str(e)
+
+    def _prime_masters(self):
+        """Open a persistent SSH connection to every node"""
+        if self._loop is not None:
+            # Remote commands go through the cached asyncssh connections, so
+            # warm those instead of opening ControlMaster processes nothing
+            # would reuse
+            self._map_nodes(lambda node: self.ssh_command(node, "true", check=False))
+            return
+        self._map_nodes(lambda node: self.run_command(
+            ["ssh", *self._ssh_opts, "-fN", f"{self.ssh_user}@{node}"],
+            check=False, capture_output=True
+        ))
+
+    def _close_ssh_masters(self):
+        """Tear down the SSH master connections and control sockets"""
+        if self._loop is not None:
+            for conn in self._conns.values():
+                self._loop.call_soon_threadsafe(conn.close)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        for node in self.all_nodes:
+            self.run_command(
+                ["ssh", *self._ssh_opts, "-O", "exit", f"{self.ssh_user}@{node}"],
+                check=False, capture_output=True
+            )
+        shutil.rmtree(self._ssh_ctl_dir, ignore_errors=True)
+
     def check_prerequisites(self) -> bool:
         """Check if all prerequisites are met"""
         self.print_step("Checking Prerequisites")
 
         all_ok = True
 
-        # Check if terraform is installed
-        returncode, _, _ = self.run_command("terraform version", check=False, capture_output=True)
-        if returncode == 0:
+        # Check if terraform is installed (PATH lookup, no process spawn)
+        if shutil.which("terraform"):
             self.print_success("Terraform is installed")
         else:
             self.print_error("Terraform is not installed")
             all_ok = False
 
         # Check if kubectl is installed
-        returncode, _, _ = self.run_command("kubectl version --client", check=False, capture_output=True)
-        if returncode == 0:
+        if shutil.which("kubectl"):
             self.print_success("kubectl is installed")
         else:
             self.print_warning("kubectl is not installed (optional, but recommended)")
@@ -114,7 +290,7 @@ class ClusterSetup:
 
         self.ssh_key_path.parent.mkdir(parents=True, exist_ok=True)
         returncode, _, _ = self.run_command(
-            f'ssh-keygen -t rsa -b 4096 -f {self.ssh_key_path} -N ""',
+            ["ssh-keygen", "-t", "rsa", "-b", "4096", "-f", str(self.ssh_key_path), "-N", ""],
             check=False
         )
 
@@ -128,11 +304,27 @@ class ClusterSetup:
         """Copy SSH keys to all nodes"""
         self.print_step("Copying SSH Keys to Nodes")
 
-        for node in self.all_nodes:
-            print(f"\nCopying SSH key to {node}...")
+        pub_key_path = self.ssh_key_path.with_suffix(".pub")
+        if not pub_key_path.exists():
+            self.print_error(f"Public key not found at {pub_key_path}")
+            return
+        pub_key = pub_key_path.read_text().strip() + "\n"
+
+        # Read the public key once locally and append it over a single SSH
+        # session per node; ssh-copy-id opens two connections per node and
+        # runs several remote commands. The grep guard makes reruns no-ops
+        # without touching any other keys already authorized on the node.
+        remote_cmd = (
+            "mkdir -p ~/.ssh && chmod 700 ~/.ssh"
+            " && touch ~/.ssh/authorized_keys && chmod 600 ~/.ssh/authorized_keys"
+            f" && {{ grep -qxF {shlex.quote(pub_key.strip())} ~/.ssh/authorized_keys"
+            " || cat >> ~/.ssh/authorized_keys; }"
+        )
+
+        def copy_one(node: str):
             returncode, _, _ = self.run_command(
-                f"ssh-copy-id -i {self.ssh_key_path} {self.ssh_user}@{node}",
-                check=False
+                ["ssh", *self._ssh_opts, f"{self.ssh_user}@{node}", remote_cmd],
+                check=False, capture_output=True, input=pub_key
             )
 
             if returncode == 0:
@@ -140,81 +332,106 @@ class ClusterSetup:
             else:
                 self.print_error(f"Failed to copy SSH key to {node}")
 
+        self._map_nodes(copy_one)
+
     def test_ssh_connections(self) -> bool:
         """Test SSH connections to all nodes"""
         self.print_step("Testing SSH Connections")
 
-        all_ok = True
-        for node in self.all_nodes:
+        def test_one(node: str) -> bool:
             returncode, stdout, _ = self.ssh_command(node, "echo 'Connection successful'", check=False)
 
             if returncode == 0 and "Connection successful" in stdout:
                 self.print_success(f"SSH connection to {node} successful")
-            else:
-                self.print_error(f"SSH connection to {node} failed")
-                all_ok = False
+                return True
+            self.print_error(f"SSH connection to {node} failed")
+            return False
 
-        return all_ok
+        return all(self._map_nodes(test_one))
 
     def setup_sudoers(self):
         """Setup passwordless sudo on all nodes"""
         self.print_step("Setting up Passwordless Sudo")
 
-        for node in self.all_nodes:
-            print(f"\nConfiguring sudo on {node}...")
+        # Create sudoers file, fix permissions and test sudo in one session
+        user = shlex.quote(self.ssh_user)
+        cmd = (
+            f"printf '%s ALL=(ALL) NOPASSWD:ALL\\n' {user} | sudo tee /etc/sudoers.d/{user}"
+            f' && sudo chmod 0440 /etc/sudoers.d/{user}'
+            f' && sudo ls /root'
+        )
 
-            # Create sudoers file
-            cmd = f'echo "{self.ssh_user} ALL=(ALL) NOPASSWD:ALL" | sudo tee /etc/sudoers.d/{self.ssh_user}'
+        def setup_one(node: str):
             returncode, _, _ = self.ssh_command(node, cmd, check=False)
 
             if returncode == 0:
-                # Set correct permissions
-                self.ssh_command(node, f"sudo chmod 0440 /etc/sudoers.d/{self.ssh_user}", check=False)
-
-                # Test sudo
-                test_returncode, _, _ = self.ssh_command(node, "sudo ls /root", check=False)
-                if test_returncode == 0:
-                    self.print_success(f"Passwordless sudo configured on {node}")
-                else:
-                    self.print_error(f"Sudo test failed on {node}")
+                self.print_success(f"Passwordless sudo configured on {node}")
             else:
                 self.print_error(f"Failed to configure sudo on {node}")
 
+        self._map_nodes(setup_one)
+
     def prepare_nodes(self):
         """Prepare all nodes with required packages and configurations"""
         self.print_step("Preparing Nodes")
 
-        for node in self.all_nodes:
-            print(f"\n{Colors.OKCYAN}Preparing {node}...{Colors.ENDC}")
+        # Update system, install required packages and disable swap in a
+        # single remote script instead of one SSH round-trip per step.
+        # The package-manager run is skipped entirely when curl and jq are
+        # already present, and dispatches on /etc/os-release otherwise so
+        # non-Debian nodes no longer fail silently on apt-get.
+        prep_script = (
+            "set -e\n"
+            "if ! command -v curl >/dev/null || ! command -v jq >/dev/null; then\n"
+            "  . /etc/os-release\n"
+            "  case \"$ID $ID_LIKE\" in\n"
+            "    *debian*|*ubuntu*)\n"
+            # Only refresh the package lists if they are older than an hour
+            "      if [ -z \"$(find /var/lib/apt/lists -maxdepth 1 -mmin -60 -print -quit 2>/dev/null)\" ]; then\n"
+            "        sudo apt-get update -qq\n"
+            "      fi\n"
+            "      sudo apt-get install -y curl jq ;;\n"
+            "    *rhel*|*fedora*|*centos*)\n"
+            "      sudo dnf install -y curl jq ;;\n"
+            "    *suse*)\n"
+            "      sudo zypper --non-interactive install curl jq ;;\n"
+            "    *)\n"
+            "      echo \"Unsupported distribution: $ID\" >&2\n"
+            "      exit 1 ;;\n"
+            "  esac\n"
+            "fi\n"
+            "sudo swapoff -a\n"
+            "sudo sed -i '/ swap / s/^/#/' /etc/fstab\n"
+        )
 
-            # Update system
-            print("  - Updating system...")
-            self.ssh_command(node, "sudo apt-get update -qq", check=False)
+        def prepare_one(node: str):
+            self.log.info(f"Preparing {node}...", extra={"color": Colors.OKCYAN})
 
-            # Install required packages
-            print("  - Installing required packages...")
-            self.ssh_command(node, "sudo apt-get install -y curl jq", check=False)
+            returncode, _, _ = self.ssh_command(node, prep_script, check=False)
 
-            # Disable swap
-            print("  - Disabling swap...")
-            self.ssh_command(node, "sudo swapoff -a", check=False)
-            self.ssh_command(node, "sudo sed -i '/ swap / s/^/#/' /etc/fstab", check=False)
+            if returncode == 0:
+                self.print_success(f"Node {node} prepared")
+            else:
+                self.print_error(f"Failed to prepare node {node}")
 
-            self.print_success(f"Node {node} prepared")
+        self._map_nodes(prepare_one)
 
     def configure_firewall(self):
         """Configure firewall rules on nodes"""
         self.print_step("Configuring Firewall")
 
-        # Check if UFW is active
-        returncode, stdout, _ = self.ssh_command(self.master_ip, "sudo ufw status", check=False)
+        # Probe UFW state on every node in parallel so the per-port rules
+        # are only pushed to nodes where UFW is actually active
+        states = self._map_nodes(
+            lambda node: "inactive" not in self.ssh_command(node, "sudo ufw status", check=False)[1].lower()
+        )
+        ufw_active = dict(zip(self.all_nodes, states))
 
-        if "inactive" in stdout.lower():
-            self.print_warning("UFW is not active, skipping firewall configuration")
+        if not any(ufw_active.values()):
+            self.print_warning("UFW is not active on any node, skipping firewall configuration")
             return
 
         # Configure master node
-        print(f"\n{Colors.OKCYAN}Configuring firewall on master node...{Colors.ENDC}")
         master_ports = [
             ("6443/tcp", "Kubernetes API"),
             ("9345/tcp", "RKE2 supervisor API"),
@@ -222,32 +439,59 @@ class ClusterSetup:
             ("2379:2380/tcp", "etcd")
         ]
 
-        for port, description in master_ports:
-            print(f"  - Allowing {port} ({description})")
-            self.ssh_command(self.master_ip, f"sudo ufw allow {port}", check=False)
+        if ufw_active[self.master_ip]:
+            self.log.info("Configuring firewall on master node...", extra={"color": Colors.OKCYAN})
+            for port, description in master_ports:
+                self.log.info(f"  - Allowing {port} ({description})")
+            self.ssh_command(
+                self.master_ip,
+                " && ".join(f"sudo ufw allow {port}" for port, _ in master_ports),
+                check=False
+            )
 
-        self.print_success("Master node firewall configured")
+            self.print_success("Master node firewall configured")
+        else:
+            self.print_warning("UFW is not active on master node, skipping")
 
         # Configure worker nodes
-        for worker in self.worker_ips:
-            print(f"\n{Colors.OKCYAN}Configuring firewall on {worker}...{Colors.ENDC}")
-            worker_ports = [
-                ("10250/tcp", "Kubelet"),
-                ("30000:32767/tcp", "NodePort services")
-            ]
+        worker_ports = [
+            ("10250/tcp", "Kubelet"),
+            ("30000:32767/tcp", "NodePort services")
+        ]
 
-            for port, description in worker_ports:
-                print(f"  - Allowing {port} ({description})")
-                self.ssh_command(worker, f"sudo ufw allow {port}", check=False)
+        def configure_worker(worker: str):
+            self.log.info(f"Configuring firewall on {worker}...", extra={"color": Colors.OKCYAN})
+
+            self.ssh_command(
+                worker,
+                " && ".join(f"sudo ufw allow {port}" for port, _ in worker_ports),
+                check=False
+            )
 
             self.print_success(f"Worker node {worker} firewall configured")
 
+        active_workers = [worker for worker in self.worker_ips if ufw_active[worker]]
+        for worker in self.worker_ips:
+            if not ufw_active[worker]:
+                self.print_warning(f"UFW is not active on {worker}, skipping")
+        if active_workers:
+            self._map_nodes(configure_worker, active_workers)
+
     def terraform_init(self):
         """Initialize Terraform"""
         self.print_step("Initializing Terraform")
 
-        os.chdir("cluster")
-        returncode, _, _ = self.run_command("terraform init")
+        # Cache provider binaries across runs so a fresh init reuses the
+        # on-disk plugins instead of re-downloading them
+        env = os.environ.copy()
+        env.setdefault("TF_PLUGIN_CACHE_DIR", str(Path.home() / ".terraform.d" / "plugin-cache"))
+        env.setdefault("TF_IN_AUTOMATION", "1")
+        Path(env["TF_PLUGIN_CACHE_DIR"]).mkdir(parents=True, exist_ok=True)
+
+        returncode = self.run_command_streaming(
+            ["terraform", f"-chdir={self.tf_dir}", "init", "-input=false", "-no-color"],
+            env=env
+        )
 
         if returncode == 0:
             self.print_success("Terraform initialized")
@@ -259,7 +503,7 @@ class ClusterSetup:
         """Validate Terraform configuration"""
         self.print_step("Validating Terraform Configuration")
 
-        returncode, _, _ = self.run_command("terraform validate")
+        returncode, _, _ = self.run_command(["terraform", f"-chdir={self.tf_dir}", "validate", "-no-color"])
 
         if returncode == 0:
             self.print_success("Terraform configuration is valid")
@@ -271,7 +515,9 @@ class ClusterSetup:
         """Run Terraform plan"""
         self.print_step("Running Terraform Plan")
 
-        returncode, _, _ = self.run_command("terraform plan")
+        returncode, _, _ = self.run_command(
+            ["terraform", f"-chdir={self.tf_dir}", "plan", "-input=false", "-no-color", "-lock-timeout=60s"]
+        )
 
         if returncode == 0:
             self.print_success("Terraform plan completed")
@@ -283,7 +529,10 @@ class ClusterSetup:
         """Apply Terraform configuration"""
         self.print_step("Applying Terraform Configuration")
 
-        returncode, _, _ = self.run_command("terraform apply -auto-approve")
+        returncode = self.run_command_streaming(
+            ["terraform", f"-chdir={self.tf_dir}", "apply", "-auto-approve", "-input=false",
+             "-no-color", "-lock-timeout=60s", "-parallelism=20"]
+        )
 
         if returncode == 0:
             self.print_success("Terraform apply completed")
@@ -295,41 +544,79 @@ class ClusterSetup:
         """Verify the cluster is working"""
         self.print_step("Verifying Cluster")
 
-        # Export kubeconfig
-        kubeconfig_path = Path.cwd() / "kubeconfig.yaml"
-        os.environ["KUBECONFIG"] = str(kubeconfig_path)
+        # Point kubectl at the cluster kubeconfig without mutating the
+        # process-global environment
+        env = {**os.environ, "KUBECONFIG": str(self.kubeconfig)}
 
-        # Wait for cluster to be ready
-        print("Waiting for cluster to be ready...")
-        time.sleep(30)
-
-        # Check nodes
-        print("\nChecking nodes...")
-        returncode, stdout, _ = self.run_command("kubectl get nodes", check=False, capture_output=True)
+        # Wait for cluster to be ready; kubectl wait returns as soon as all
+        # nodes report Ready instead of sleeping a fixed 30 seconds
+        self.log.info("Waiting for cluster to be ready...")
+        returncode, _, _ = self.run_command(
+            ["kubectl", "wait", "--for=condition=Ready", "nodes", "--all", "--timeout=300s"],
+            check=False, capture_output=True, env=env
+        )
+        if returncode != 0:
+            # Fall back to polling in case the API server isn't up yet
+            for _ in range(60):
+                returncode, stdout, _ = self.run_command(
+                    ["kubectl", "get", "nodes"], check=False, capture_output=True, env=env
+                )
+                if returncode == 0 and " Ready" in stdout:
+                    break
+                time.sleep(2)
+
+        # Check nodes and pods with a single API round trip
+        self.log.info("Checking nodes and pods...")
+        returncode, stdout, _ = self.run_command(
+            ["kubectl", "get", "nodes,pods", "-A", "-o", "json"],
+            check=False, capture_output=True, env=env
+        )
         if returncode == 0:
-            print(stdout)
-            self.print_success("Nodes are accessible")
+            data = json.loads(stdout)
+            nodes = [item for item in data["items"] if item["kind"] == "Node"]
+            pods = [item for item in data["items"] if item["kind"] == "Pod"]
+
+            self.log.info("\nNodes:")
+            for node in nodes:
+                conditions = {c["type"]: c["status"] for c in node["status"].get("conditions", [])}
+                state = "Ready" if conditions.get("Ready") == "True" else "NotReady"
+                self.log.info(f"  {node['metadata']['name']:<30} {state}")
+
+            self.log.info("\nPods:")
+            for pod in pods:
+                name = f"{pod['metadata']['namespace']}/{pod['metadata']['name']}"
+                self.log.info(f"  {name:<60} {pod['status'].get('phase', 'Unknown')}")
+
+            self.print_success(f"{len(nodes)} nodes and {len(pods)} pods accessible")
         else:
-            self.print_error("Failed to get nodes")
+            # Fall back to the individual commands
+            self.log.info("Checking nodes...")
+            returncode, stdout, _ = self.run_command(["kubectl", "get", "nodes"], check=False, capture_output=True, env=env)
+            if returncode == 0:
+                self.log.info(stdout)
+                self.print_success("Nodes are accessible")
+            else:
+                self.print_error("Failed to get nodes")
 
-        # Check pods
-        print("\nChecking pods...")
-        returncode, stdout, _ = self.run_command("kubectl get pods -A", check=False, capture_output=True)
-        if returncode == 0:
-            print(stdout)
-            self.print_success("Pods are accessible")
-        else:
-            self.print_error("Failed to get pods")
+            self.log.info("Checking pods...")
+            returncode, stdout, _ = self.run_command(["kubectl", "get", "pods", "-A"], check=False, capture_output=True, env=env)
+            if returncode == 0:
+                self.log.info(stdout)
+                self.print_success("Pods are accessible")
+            else:
+                self.print_error("Failed to get pods")
 
-        # Cluster info
-        print("\nCluster info:")
-        self.run_command("kubectl cluster-info", check=False)
+            self.log.info("Cluster info:")
+            self.run_command(["kubectl", "cluster-info"], check=False, env=env)
 
     def terraform_destroy(self):
         """Destroy the Terraform-managed infrastructure"""
         self.print_step("Destroying Cluster")
 
-        returncode, _, _ = self.run_command("terraform destroy -auto-approve")
+        returncode = self.run_command_streaming(
+            ["terraform", f"-chdir={self.tf_dir}", "destroy", "-auto-approve", "-input=false",
+             "-no-color", "-lock-timeout=60s", "-parallelism=20"]
+        )
 
         if returncode == 0:
             self.print_success("Cluster destroyed")
@@ -349,6 +636,7 @@ def main():
     parser.add_argument("--skip-firewall", action="store_true", help="Skip firewall configuration")
     parser.add_argument("--destroy", action="store_true", help="Destroy the cluster")
     parser.add_argument("--verify-only", action="store_true", help="Only verify the cluster")
+    parser.add_argument("--plan-only", action="store_true", help="Run terraform plan and exit")
 
     args = parser.parse_args()
 
@@ -367,15 +655,24 @@ def main():
         setup.verify_cluster()
         return
 
+    if args.plan_only:
+        setup.terraform_init()
+        setup.terraform_validate()
+        setup.terraform_plan()
+        return
+
     if not setup.check_prerequisites():
         sys.exit(1)
 
     setup.generate_ssh_key()
+    setup.scan_host_keys()
     setup.copy_ssh_keys()
 
     if not setup.test_ssh_connections():
         sys.exit(1)
 
+    setup._prime_masters()
+
     setup.setup_sudoers()
 
     if not args.skip_prep:
@@ -384,9 +681,9 @@ def main():
     if not args.skip_firewall:
         setup.configure_firewall()
 
+    # terraform apply plans internally, so no standalone plan on this path
     setup.terraform_init()
     setup.terraform_validate()
-    setup.terraform_plan()
     setup.terraform_apply()
     setup.verify_cluster()
 